@@ -0,0 +1,124 @@
+"""Micro-benchmarks for the bot's hot paths.
+
+python bench.py [name ...]
+"""
+import asyncio
+import gc
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import web
+
+from conversations import ConversationManager
+from database import Database
+
+
+def bench_conversation_load(n=2000):
+  """Time and retained memory of loading conversations from the DB."""
+  db = Database(sqlite3.connect(':memory:'))
+  for i in range(n):
+    db.save(str(i), 'prompt', True, [], 'Aoi', [])
+  manager = ConversationManager(None, db, 'prompt')
+
+  async def load_all():
+    for i in range(n):
+      convo = await manager.get(str(i))
+      convo.tools.tools()
+
+  # the tools module is imported lazily; keep that one-off cost out of the loop
+  asyncio.run(manager.get('0')).tools.tools()
+  gc.collect()
+  tracemalloc.start()
+  start = time.perf_counter()
+  asyncio.run(load_all())
+  elapsed = time.perf_counter() - start
+  gc.collect()
+  retained, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  print(
+      f'conversation_load: {elapsed / n * 1e6:.1f} us/load, '
+      f'{retained / 1024:.1f} KiB retained after {n} loads'
+  )
+
+
+def bench_startup(runs=5):
+  """Wall time to import the bot's modules in a fresh interpreter."""
+  script = (
+      'import time; start = time.perf_counter(); '
+      'import discord.ext.commands, conversations, database, llm_client; '
+      'print(time.perf_counter() - start); '
+      'import sys; print(sorted({"tools", "pydantic", "html2text"} & '
+      'set(sys.modules)))'
+  )
+  times = []
+  for _ in range(runs):
+    out = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True,
+        check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout.split('\n')
+    times.append(float(out[0]))
+  print(
+      f'startup: {min(times) * 1000:.1f} ms best of {runs} imports, '
+      f'heavy modules loaded: {out[1]}'
+  )
+
+
+def bench_setup(runs=5):
+  """Time of AoiBot.setup_hook against a stub backend and command tree.
+
+  The first run on a fresh DB syncs commands, later runs skip the sync
+  because the command tree hash is unchanged.
+  """
+  async def run():
+    app = web.Application()
+    app.router.add_get('/v1/models', lambda request: web.json_response({}))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+      argv = [
+          'bot.py', f'--base_url=http://127.0.0.1:{port}/v1',
+          f'--db={os.path.join(tmp, "bench.db")}',
+      ]
+      with patch.object(sys, 'argv', argv):
+        import bot
+      bot.bot._connection.application_id = 1
+      # stands in for the global REST call, which is rate-limited
+      bot.bot.tree.sync = AsyncMock()
+      times = []
+      for _ in range(runs):
+        start = time.perf_counter()
+        await bot.bot.setup_hook()
+        times.append(time.perf_counter() - start)
+        bot.maintenance.cancel()
+        await bot.bot.manager.client.close()
+        bot.bot.manager.db.conn.close()
+    await runner.cleanup()
+    print(
+        f'setup: {times[0] * 1000:.1f} ms first run, '
+        f'{min(times[1:]) * 1000:.1f} ms best later run, '
+        f'{bot.bot.tree.sync.await_count} command sync(s) in {runs} runs'
+    )
+
+  asyncio.run(run())
+
+
+BENCHMARKS = {
+    'conversation_load': bench_conversation_load,
+    'startup': bench_startup,
+    'setup': bench_setup,
+}
+
+
+if __name__ == '__main__':
+  for name in sys.argv[1:] or BENCHMARKS:
+    BENCHMARKS[name]()
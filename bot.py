@@ -1,8 +1,12 @@
 import argparse
+import asyncio
+import datetime
+import hashlib
+import json
 import os
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from conversations import ConversationManager
 from database import Database
@@ -34,23 +38,80 @@ parser.add_argument(
 parser.add_argument(
     '--db', default='conversations.db', help='SQLite DB to use.',
 )
+parser.add_argument(
+    '--prewarm', action='store_true',
+    help='Load prompts into the backend prompt cache ahead of the first turn.',
+)
+parser.add_argument(
+    '--prewarm_recent', type=int, default=1,
+    help='How many recently active conversations to prewarm at startup. '
+    'Capped at --prewarm_concurrency.',
+)
+parser.add_argument(
+    '--prewarm_concurrency', type=int, default=1,
+    help='Maximum number of concurrent prewarm requests. Set this to the '
+    "backend's slot count (llama.cpp --parallel).",
+)
+parser.add_argument(
+    '--archive_after_days', type=float, default=30,
+    help='Archive conversations idle for this many days. 0 to disable.',
+)
+parser.add_argument(
+    '--maintenance_hour', type=int, default=4,
+    help='Hour of day (UTC) to archive idle chats and vacuum the DB.',
+)
 args = parser.parse_args()
+if args.prewarm_concurrency < 1:
+  parser.error('--prewarm_concurrency must be at least 1')
 
 # --- Bot Setup ---
 
 
 class AoiBot(commands.Bot):
   async def setup_hook(self):
-    db = Database.get(args.db)
     llm_client = LLMClient(
         base_url=args.base_url,
         model=args.model,
         api_key=os.environ.get("OPENAI_API_KEY") or "",
         backup_url=args.backup_base_url,
     )
+    db, _ = await asyncio.gather(
+        asyncio.to_thread(Database.get, args.db), llm_client.open(),
+    )
     self.manager = ConversationManager(
         llm_client, db, args.default_prompt,
+        prewarm=args.prewarm, prewarm_concurrency=args.prewarm_concurrency,
     )
+    if args.prewarm:
+      await self.manager.warm_recent(args.prewarm_recent)
+    maintenance.start()
+    await self.sync_commands()
+
+  async def sync_commands(self):
+    """Syncs app commands, skipping the slow REST call if unchanged."""
+    specs = [
+        command.to_dict(self.tree) for command in self.tree.get_commands()
+    ]
+    tree_hash = hashlib.sha256(
+        json.dumps(specs, sort_keys=True).encode()
+    ).hexdigest()
+    # per application, so one DB shared by e.g. dev and prod bots still syncs
+    meta_key = f'command_tree_hash:{self.application_id}'
+    if self.manager.db.get_meta(meta_key) == tree_hash:
+      return
+    try:
+      await self.tree.sync()
+    except discord.HTTPException as e:
+      # don't block startup; the hash is left stale so the next start retries
+      print(f'Failed to sync app commands: {e}')
+      return
+    self.manager.db.set_meta(meta_key, tree_hash)
+    print('Synced app commands')
+
+  async def close(self):
+    if hasattr(self, 'manager'):
+      await self.manager.client.close()
+    await super().close()
 
 
 intents = discord.Intents.default()
@@ -100,12 +161,35 @@ async def clear_reactions(channel, message_ids):
       pass  # Ignore if message is not found or we don't have perms
 
 
+# --- Maintenance ---
+@tasks.loop(time=datetime.time(hour=args.maintenance_hour))
+async def maintenance():
+  try:
+    await asyncio.to_thread(run_maintenance)
+  except Exception as e:
+    # an uncaught error would stop the loop until the next restart
+    print(f'DB maintenance failed: {e}')
+
+
+def run_maintenance():
+  # Uses its own connection so its transactions cannot interleave with the
+  # event loop's; SQLite locking serializes the two.
+  db = Database.get(args.db)
+  try:
+    if args.archive_after_days:
+      archived = db.archive_idle(args.archive_after_days * 24 * 60 * 60)
+      print(f'Archived {archived} idle conversations')
+    db.maintain()
+    print(f'DB stats: {db.stats()}')
+  finally:
+    db.conn.close()
+
+
 # --- Bot Events ---
 @bot.event
 async def on_ready():
   print(f'Logged in as {bot.user.name}')
   print(f'Using OpenAI base URL: {args.base_url}')
-  await bot.tree.sync()
 
 
 @bot.event
@@ -219,6 +303,7 @@ async def changeprompt(
   channel_id = interaction.channel_id
   conversation = await bot.manager.get(channel_id)
   await conversation.update_prompt(prompt, web_access)
+  bot.manager.warm(conversation)
   await interaction.followup.send(
       f'Now chatting with {conversation.bot_name}: '
       f'"{conversation.prompt}"'
@@ -1,14 +1,17 @@
 import aiohttp
+import asyncio
 import base64
+import hashlib
 import json
-
-from tools import Tools
+import time
 
 DEFAULT_NAME = "Aoi"
 #NAME_PROMPT = "reply with your name, nothing else, no punctuation"
 NAME_PROMPT = """reply with your name if given in the system prompt.
 If no name is given in the system prompt, come up with a name fitting for you.
 Reply with just the name, nothing else, no punctuation.""".strip()
+# How long a warmed prompt is assumed to stay in the backend's prompt cache.
+WARM_TTL = 5 * 60
 
 
 async def get_name(client, prompt):
@@ -25,14 +28,24 @@ async def get_name(client, prompt):
 class ConversationManager:
   """Creates and retrieves Conversations."""
 
-  def __init__(self, llm_client, db, default_prompt):
+  def __init__(
+      self, llm_client, db, default_prompt,
+      prewarm=False, prewarm_concurrency=1,
+  ):
     self.client = llm_client
     self.db = db
     self.default_prompt = default_prompt
+    if prewarm_concurrency < 1:
+      raise ValueError("prewarm_concurrency must be at least 1")
+    self.prewarm = prewarm
+    self.prewarm_concurrency = prewarm_concurrency
+    self._warm_semaphore = asyncio.Semaphore(prewarm_concurrency)
+    self._warmed = {}
+    self._warm_tasks = set()
 
   async def get(self, key, create_if_missing=True):
     """Gets a conversation based on |key|, optionally create when not found."""
-    convo_data = self.db.get_conversation(key)
+    convo_data = self.db.get_conversation(key) or self.db.restore(key)
     if convo_data:
       prompt, web_access, history, bot_name, last_messages = convo_data
       return Conversation(
@@ -40,10 +53,14 @@ class ConversationManager:
           self.client, self.db,
       )
     if create_if_missing:
-      return await self.new_conversation(key, self.default_prompt)
+      # the caller is about to send a real request, which a warm-up would
+      # only delay or duplicate
+      return await self.new_conversation(key, self.default_prompt, warm=False)
     return None
 
-  async def new_conversation(self, key, prompt=None, web_access=False):
+  async def new_conversation(
+      self, key, prompt=None, web_access=False, warm=True,
+  ):
     """Creates a new Conversation with key based on given prompt."""
     prompt = prompt or self.default_prompt
     name = await get_name(self.client, prompt)
@@ -54,8 +71,55 @@ class ConversationManager:
         self.client, self.db,
     )
     await convo.save()
+    if warm:
+      self.warm(convo)
     return convo
 
+  def warm(self, convo):
+    """Schedules a background warm-up of |convo| if prewarming is enabled.
+
+    Identical prompts (including tools and history) are warmed at most once
+    per WARM_TTL.
+    """
+    if not self.prewarm:
+      return
+    key = hashlib.sha256(
+        json.dumps([convo.prompt, convo.web_access, convo.history]).encode()
+    ).hexdigest()
+    now = time.monotonic()
+    self._warmed = {
+        k: t for k, t in self._warmed.items() if now - t < WARM_TTL
+    }
+    if key in self._warmed:
+      return
+    self._warmed[key] = now
+    task = asyncio.create_task(self._warm(convo, key))
+    self._warm_tasks.add(task)
+    task.add_done_callback(self._warm_tasks.discard)
+
+  async def _warm(self, convo, key):
+    async with self._warm_semaphore:
+      try:
+        await convo.warm()
+      except Exception as e:
+        # allow the next warm() of this prompt to try again
+        self._warmed.pop(key, None)
+        print(f"Error warming up conversation {convo.id}: {e}")
+
+  async def warm_recent(self, limit):
+    """Warms up the |limit| most recently active conversations.
+
+    Capped at prewarm_concurrency, the backend's slot count: each slot
+    caches one prompt, so further warm-ups would only evict earlier ones
+    while delaying real requests.
+    """
+    for key in self.db.recent_conversations(
+        min(limit, self.prewarm_concurrency)
+    ):
+      convo = await self.get(key, create_if_missing=False)
+      if convo:
+        self.warm(convo)
+
 
 class Conversation:
   """Holds data about a conversation thread."""
@@ -74,7 +138,12 @@ class Conversation:
     self.last_messages = last_messages
     self.client = api_client
     self.db = db
-    self.tools = Tools()
+
+  @property
+  def tools(self):
+    # tools pulls in pydantic and html2text, so only load it once needed.
+    from tools import TOOLS
+    return TOOLS
 
   async def save(self):
     """Saves the conversation to the DB."""
@@ -101,6 +170,19 @@ class Conversation:
       self.web_access = web_access
     await self.save()
 
+  async def warm(self):
+    """Loads prompt, tools and history into the backend's prompt cache."""
+    # A placeholder user turn keeps chat templates that require one happy;
+    # only its few tokens differ from the next real request.
+    await self.client.chat(
+        messages=self._messages([{"role": "user", "content": "."}]),
+        tools=self.tools.tools() if self.web_access else None,
+        extra_body={"cache_prompt": True, "max_tokens": 1},
+    )
+
+  def _messages(self, turns):
+    return [{"role": "system", "content": self.prompt}] + self.history + turns
+
   async def generate(self, text, media=tuple()):
     """Generates next assistant conversation turn."""
     # prepare text part
@@ -135,12 +217,8 @@ class Conversation:
     to_sends = [user_turns]
     while to_sends:
       to_send = to_sends.pop(0)
-      request = (
-          [{"role": "system", "content": self.prompt}]
-          + self.history + to_send
-      )
       llm_response = await self.client.chat(
-          messages=request,
+          messages=self._messages(to_send),
           tools=self.tools.tools() if self.web_access else None,
           extra_body={"cache_prompt": True},
       )
@@ -153,11 +231,16 @@ class Conversation:
         tool_results = []
         for tool_call in llm_response['tool_calls']:
           print(f"calling {tool_call['function']}... ")
-          # Call may be async; await if needed
-          tool_result_text = await self.tools.call(
-              tool_call['function']['name'],
-              **json.loads(tool_call['function']['arguments'])
-          )
+          # Bad arguments are reported back so the model can correct itself
+          try:
+            arguments = json.loads(tool_call['function']['arguments'] or '{}')
+            if not isinstance(arguments, dict):
+              raise ValueError("arguments must be a JSON object")
+            tool_result_text = await self.tools.call(
+                tool_call['function']['name'], arguments
+            )
+          except ValueError as e:
+            tool_result_text = f"error: {e}"
           tool_results.append({
               "role": "tool",
               "tool_call_id": tool_call['id'],
@@ -0,0 +1,148 @@
+import asyncio
+import sqlite3
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from conversations import Conversation, ConversationManager
+from database import Database
+
+
+class ConversationManagerTest(unittest.IsolatedAsyncioTestCase):
+  def setUp(self):
+    self.client = AsyncMock()
+    self.client.chat.return_value = {
+        'choices': [{'message': {'content': 'Aoi'}}],
+    }
+    self.db = Database(sqlite3.connect(':memory:'))
+
+  async def test_new_conversation_warms_once_per_prompt(self):
+    manager = ConversationManager(self.client, self.db, 'prompt', prewarm=True)
+    await manager.new_conversation('1')
+    await manager.new_conversation('2')
+    await asyncio.gather(*manager._warm_tasks)
+    # one name lookup per conversation plus a single warm-up
+    self.assertEqual(self.client.chat.await_count, 3)
+    warm_call = self.client.chat.await_args_list[-1]
+    self.assertEqual(warm_call.kwargs['messages'][0]['content'], 'prompt')
+    self.assertIsNone(warm_call.kwargs['tools'])
+    self.assertEqual(warm_call.kwargs['extra_body']['max_tokens'], 1)
+
+  async def test_warm_disabled(self):
+    manager = ConversationManager(self.client, self.db, 'prompt')
+    await manager.new_conversation('1')
+    self.assertFalse(manager._warm_tasks)
+    self.assertEqual(self.client.chat.await_count, 1)
+
+  async def test_get_does_not_warm(self):
+    manager = ConversationManager(self.client, self.db, 'prompt', prewarm=True)
+    await manager.get('1')
+    self.assertFalse(manager._warm_tasks)
+    self.assertEqual(self.client.chat.await_count, 1)
+
+  def test_prewarm_concurrency_must_be_positive(self):
+    with self.assertRaises(ValueError):
+      ConversationManager(
+          self.client, self.db, 'prompt', prewarm=True, prewarm_concurrency=0,
+      )
+
+  async def test_warm_recent(self):
+    self.db.save('1', 'a', True, [], 'Aoi', [])
+    self.db.save('2', 'b', False, [], 'Aoi', [])
+    manager = ConversationManager(
+        self.client, self.db, 'prompt', prewarm=True, prewarm_concurrency=2,
+    )
+    await manager.warm_recent(10)
+    await asyncio.gather(*manager._warm_tasks)
+    prompts = {
+        call.kwargs['messages'][0]['content']
+        for call in self.client.chat.await_args_list
+    }
+    self.assertEqual(prompts, {'a', 'b'})
+
+  async def test_warm_recent_capped_at_slot_count(self):
+    with patch('database.time.time', return_value=1000):
+      self.db.save('1', 'a', False, [], 'Aoi', [])
+    self.db.save('2', 'b', False, [], 'Aoi', [])
+    manager = ConversationManager(self.client, self.db, 'prompt', prewarm=True)
+    await manager.warm_recent(10)
+    await asyncio.gather(*manager._warm_tasks)
+    # only the most recently active conversation fits in the single slot
+    self.assertEqual(self.client.chat.await_count, 1)
+    self.assertEqual(
+        self.client.chat.await_args.kwargs['messages'][0]['content'], 'b',
+    )
+
+  async def test_warm_errors_are_swallowed(self):
+    self.client.chat.side_effect = RuntimeError('backend down')
+    self.db.save('1', 'a', False, [], 'Aoi', [])
+    manager = ConversationManager(self.client, self.db, 'prompt', prewarm=True)
+    await manager.warm_recent(1)
+    await asyncio.gather(*manager._warm_tasks)
+    self.assertEqual(self.client.chat.await_count, 1)
+    # a failed warm-up is retried instead of being deduplicated
+    await manager.warm_recent(1)
+    await asyncio.gather(*manager._warm_tasks)
+    self.assertEqual(self.client.chat.await_count, 2)
+
+
+class ConversationTest(unittest.IsolatedAsyncioTestCase):
+  async def test_bad_tool_arguments_are_returned_to_model(self):
+    client = AsyncMock()
+    tool_call = {
+        'id': 'call_1',
+        'type': 'function',
+        'function': {'name': 'web_search', 'arguments': '{"count": 3}'},
+    }
+    client.chat.side_effect = [
+        {'choices': [{'message': {'content': '', 'tool_calls': [tool_call]}}]},
+        {'choices': [{'message': {'content': 'sorry'}}]},
+    ]
+    db = Database(sqlite3.connect(':memory:'))
+    convo = Conversation('1', 'Aoi', 'prompt', True, [], [], client, db)
+
+    self.assertEqual(await convo.generate('search'), 'sorry')
+    tool_turn = convo.history[2]
+    self.assertEqual(tool_turn['role'], 'tool')
+    self.assertEqual(tool_turn['tool_call_id'], 'call_1')
+    self.assertEqual(
+        tool_turn['content'], 'error: web_search: unexpected arguments: count',
+    )
+    # the error was sent back to the model on the follow-up request
+    self.assertIn(tool_turn, client.chat.await_args.kwargs['messages'])
+
+  async def test_malformed_tool_arguments_are_returned_to_model(self):
+    client = AsyncMock()
+    tool_call = {
+        'id': 'call_1',
+        'type': 'function',
+        'function': {'name': 'get_time', 'arguments': '{not json'},
+    }
+    client.chat.side_effect = [
+        {'choices': [{'message': {'content': '', 'tool_calls': [tool_call]}}]},
+        {'choices': [{'message': {'content': 'oops'}}]},
+    ]
+    db = Database(sqlite3.connect(':memory:'))
+    convo = Conversation('1', 'Aoi', 'prompt', True, [], [], client, db)
+
+    self.assertEqual(await convo.generate('time?'), 'oops')
+    self.assertTrue(convo.history[2]['content'].startswith('error: '))
+
+  async def test_tool_argument_named_method_is_returned_to_model(self):
+    client = AsyncMock()
+    tool_call = {
+        'id': 'call_1',
+        'type': 'function',
+        'function': {'name': 'get_time', 'arguments': '{"method": "x"}'},
+    }
+    client.chat.side_effect = [
+        {'choices': [{'message': {'content': '', 'tool_calls': [tool_call]}}]},
+        {'choices': [{'message': {'content': 'ok'}}]},
+    ]
+    db = Database(sqlite3.connect(':memory:'))
+    convo = Conversation('1', 'Aoi', 'prompt', True, [], [], client, db)
+
+    self.assertEqual(await convo.generate('time?'), 'ok')
+    self.assertEqual(
+        convo.history[2]['content'],
+        'error: get_time: unexpected arguments: method',
+    )
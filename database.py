@@ -1,17 +1,29 @@
 import sqlite3
 import json
+import time
+import zlib
 
 
 class Database:
   def __init__(self, db_conn):
     self.conn = db_conn
+    self._enable_incremental_vacuum()
     self._create_table()
 
   @classmethod
   def get(cls, db_path):
     """Creates and returns a connected Database instance."""
     print(f"Initializing DB connection to: {db_path}")
-    return Database(sqlite3.connect(db_path))
+    # Opened off the event loop thread at startup, then used from the loop.
+    return Database(sqlite3.connect(db_path, check_same_thread=False))
+
+  def _enable_incremental_vacuum(self):
+    # auto_vacuum only takes effect on a fresh DB or after a full VACUUM, so
+    # existing DBs pay for one full VACUUM the first time they are opened.
+    mode = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+      self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+      self.conn.execute("VACUUM")
 
   def _create_table(self):
     with self.conn:
@@ -22,9 +34,40 @@ class Database:
                     web_access BOOLEAN NOT NULL,
                     history TEXT NOT NULL,
                     bot_name TEXT NOT NULL,
-                    last_messages TEXT NOT NULL
+                    last_messages TEXT NOT NULL,
+                    last_active REAL NOT NULL DEFAULT 0
+                )
+            """)
+      self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    archived_at REAL NOT NULL
                 )
             """)
+      self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+      columns = [
+          row[1] for row in
+          self.conn.execute("PRAGMA table_info(conversations)")
+      ]
+      if "last_active" not in columns:
+        self.conn.execute(
+            "ALTER TABLE conversations "
+            "ADD COLUMN last_active REAL NOT NULL DEFAULT 0"
+        )
+        # start the idle clock at the upgrade, not at 1970
+        self.conn.execute(
+            "UPDATE conversations SET last_active = ?", (time.time(),),
+        )
+      self.conn.execute(
+          "CREATE INDEX IF NOT EXISTS conversations_last_active "
+          "ON conversations (last_active)"
+      )
 
   def get_conversation(self, conversation_id):
     with self.conn:
@@ -51,11 +94,12 @@ class Database:
     with self.conn:
       self.conn.execute(
           "INSERT OR REPLACE INTO conversations "
-          "(id, prompt, web_access, history, bot_name, last_messages) "
-          "VALUES (?, ?, ?, ?, ?, ?)",
+          "(id, prompt, web_access, history, bot_name, last_messages, "
+          "last_active) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)",
           (
               conversation_id, prompt, web_access, json.dumps(history),
-              bot_name, json.dumps(last_messages)
+              bot_name, json.dumps(last_messages), time.time(),
           ),
       )
 
@@ -64,3 +108,103 @@ class Database:
       self.conn.execute(
           "DELETE FROM conversations WHERE id = ?", (conversation_id,),
       )
+      self.conn.execute(
+          "DELETE FROM archive WHERE id = ?", (conversation_id,),
+      )
+
+  def get_meta(self, key):
+    row = self.conn.execute(
+        "SELECT value FROM meta WHERE key = ?", (key,),
+    ).fetchone()
+    return row[0] if row else None
+
+  def set_meta(self, key, value):
+    with self.conn:
+      self.conn.execute(
+          "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+          (key, value),
+      )
+
+  def recent_conversations(self, limit):
+    """Returns ids of the |limit| most recently active conversations."""
+    rows = self.conn.execute(
+        "SELECT id FROM conversations ORDER BY last_active DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+  def archive_idle(self, ttl):
+    """Moves conversations idle for more than |ttl| seconds to the archive.
+
+    Returns the number of archived conversations.
+    """
+    now = time.time()
+    with self.conn:
+      rows = self.conn.execute(
+          "SELECT id, prompt, web_access, history, bot_name, last_messages, "
+          "last_active FROM conversations WHERE last_active < ?",
+          (now - ttl,),
+      ).fetchall()
+      for row in rows:
+        data = zlib.compress(json.dumps(row[1:]).encode("utf-8"))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO archive (id, data, archived_at) "
+            "VALUES (?, ?, ?)",
+            (row[0], data, now),
+        )
+        self.conn.execute("DELETE FROM conversations WHERE id = ?", (row[0],))
+    return len(rows)
+
+  def restore(self, conversation_id):
+    """Moves an archived conversation back, returning it if it was found."""
+    with self.conn:
+      row = self.conn.execute(
+          "SELECT data FROM archive WHERE id = ?", (conversation_id,),
+      ).fetchone()
+      if not row:
+        return None
+      prompt, web_access, history, bot_name, last_messages, last_active = (
+          json.loads(zlib.decompress(row[0]).decode("utf-8"))
+      )
+      self.conn.execute(
+          "INSERT OR REPLACE INTO conversations "
+          "(id, prompt, web_access, history, bot_name, last_messages, "
+          "last_active) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)",
+          (
+              conversation_id, prompt, web_access, history,
+              bot_name, last_messages, last_active,
+          ),
+      )
+      self.conn.execute(
+          "DELETE FROM archive WHERE id = ?", (conversation_id,),
+      )
+    return self.get_conversation(conversation_id)
+
+  def maintain(self):
+    """Returns free pages to the filesystem and refreshes planner stats."""
+    self.conn.execute("PRAGMA incremental_vacuum")
+    self.conn.execute("ANALYZE")
+
+  def stats(self):
+    """Returns row counts and payload sizes of each table plus DB size."""
+    page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+    convos, convo_bytes = self.conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM("
+        "LENGTH(CAST(prompt AS BLOB)) + LENGTH(CAST(history AS BLOB)) "
+        "+ LENGTH(CAST(bot_name AS BLOB)) "
+        "+ LENGTH(CAST(last_messages AS BLOB))), 0) FROM conversations"
+    ).fetchone()
+    archived, archive_bytes = self.conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM archive"
+    ).fetchone()
+    return {
+        "db_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "conversations": convos,
+        "conversations_bytes": convo_bytes,
+        "archived": archived,
+        "archive_bytes": archive_bytes,
+    }
@@ -0,0 +1,88 @@
+import sqlite3
+import time
+import unittest
+from unittest.mock import patch
+
+from database import Database
+
+
+class DatabaseTest(unittest.TestCase):
+  def setUp(self):
+    self.db = Database(sqlite3.connect(':memory:'))
+
+  def test_save_and_get(self):
+    self.db.save('1', 'prompt', True, [{'role': 'user'}], 'Aoi', [42])
+    self.assertEqual(
+        self.db.get_conversation('1'),
+        ('prompt', True, [{'role': 'user'}], 'Aoi', [42]),
+    )
+    self.assertIsNone(self.db.get_conversation('2'))
+
+  def test_archive_and_restore(self):
+    with patch('database.time.time', return_value=1000):
+      self.db.save('old', 'prompt', False, [{'role': 'user'}], 'Aoi', [1])
+    self.db.save('new', 'prompt', False, [], 'Aoi', [])
+
+    self.assertEqual(self.db.archive_idle(60), 1)
+    self.assertIsNone(self.db.get_conversation('old'))
+    self.assertIsNotNone(self.db.get_conversation('new'))
+    stats = self.db.stats()
+    self.assertEqual(stats['conversations'], 1)
+    self.assertEqual(
+        stats['conversations_bytes'], len('prompt[]Aoi[]'),
+    )
+    self.assertEqual(stats['archived'], 1)
+
+    self.assertEqual(
+        self.db.restore('old'),
+        ('prompt', False, [{'role': 'user'}], 'Aoi', [1]),
+    )
+    self.assertEqual(self.db.stats()['archived'], 0)
+    self.assertIsNone(self.db.restore('old'))
+    # restoring keeps the original activity time, so it is still idle
+    self.assertEqual(self.db.archive_idle(60), 1)
+
+  def test_migrates_old_schema(self):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""
+        CREATE TABLE conversations (
+            id TEXT PRIMARY KEY,
+            prompt TEXT NOT NULL,
+            web_access BOOLEAN NOT NULL,
+            history TEXT NOT NULL,
+            bot_name TEXT NOT NULL,
+            last_messages TEXT NOT NULL
+        )
+    """)
+    conn.execute(
+        "INSERT INTO conversations VALUES ('1', 'p', 0, '[]', 'Aoi', '[]')"
+    )
+    conn.commit()
+    db = Database(conn)
+    self.assertEqual(db.get_conversation('1'), ('p', 0, [], 'Aoi', []))
+    # rows from before activity tracking count as active at the upgrade
+    self.assertEqual(db.archive_idle(60), 0)
+    self.assertEqual(db.recent_conversations(10), ['1'])
+    with patch('database.time.time', return_value=time.time() + 120):
+      self.assertEqual(db.archive_idle(60), 1)
+
+  def test_stats_counts_bytes(self):
+    self.db.save('1', 'ねこ', False, [], 'Aoi', [])
+    self.assertEqual(
+        self.db.stats()['conversations_bytes'],
+        len('ねこ[]Aoi[]'.encode('utf-8')),
+    )
+
+  def test_maintain(self):
+    self.db.save('1', 'prompt', False, ['x' * 10000], 'Aoi', [])
+    self.db.delete('1')
+    self.db.maintain()
+    stats = self.db.stats()
+    self.assertEqual(stats['free_bytes'], 0)
+    self.assertEqual(stats['conversations'], 0)
+
+  def test_meta(self):
+    self.assertIsNone(self.db.get_meta('key'))
+    self.db.set_meta('key', 'a')
+    self.db.set_meta('key', 'b')
+    self.assertEqual(self.db.get_meta('key'), 'b')
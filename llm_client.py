@@ -8,6 +8,31 @@ class LLMClient:
     self.model = model
     self.api_key = api_key
     self.backup_url = backup_url
+    self.session = None
+
+  def _headers(self):
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {self.api_key}",
+    }
+
+  async def open(self):
+    """Opens a shared session and connects to the server ahead of use."""
+    self.session = aiohttp.ClientSession(
+        raise_for_status=True, headers=self._headers(),
+    )
+    try:
+      async with self.session.get(
+          f"{self.base_url}/models", timeout=aiohttp.ClientTimeout(total=5),
+      ):
+        pass
+    except Exception as e:
+      print(f"Could not reach {self.base_url} yet: {e}")
+
+  async def close(self):
+    if self.session:
+      await self.session.close()
+      self.session = None
 
   async def chat(self, messages, tools=None, extra_body=None):
     """Makes a chat completion request to the LLM server."""
@@ -21,24 +46,24 @@ class LLMClient:
     if extra_body:
       payload.update(extra_body)
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {self.api_key}",
-    }
-
+    if self.session:
+      return await self._post(self.session, payload)
     async with aiohttp.ClientSession(
-        raise_for_status=True, headers=headers,
+        raise_for_status=True, headers=self._headers(),
     ) as session:
-      try:
-        async with session.post(
-            f"{self.base_url}/chat/completions", data=json.dumps(payload),
-        ) as response:
-          return await response.json()
-
-      except (aiohttp.ClientConnectorError, aiohttp.ClientResponseError) as e:
-        if not self.backup_url:
-          raise e
-        async with session.post(
-            f"{self.backup_url}/chat/completions", data=json.dumps(payload),
-        ) as response:
-          return await response.json()
+      return await self._post(session, payload)
+
+  async def _post(self, session, payload):
+    try:
+      async with session.post(
+          f"{self.base_url}/chat/completions", data=json.dumps(payload),
+      ) as response:
+        return await response.json()
+
+    except (aiohttp.ClientConnectorError, aiohttp.ClientResponseError) as e:
+      if not self.backup_url:
+        raise e
+      async with session.post(
+          f"{self.backup_url}/chat/completions", data=json.dumps(payload),
+      ) as response:
+        return await response.json()
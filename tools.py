@@ -1,13 +1,12 @@
-import collections
 import asyncio
 from datetime import datetime
-import functools
-import html2text
+import importlib.metadata
 import inspect
 import json
 import os
 import aiohttp
 from pydantic import Field
+from pydantic.fields import FieldInfo
 
 
 def get_time():
@@ -18,6 +17,7 @@ def get_time():
 
 async def web_fetch(url: str = Field(..., description="the webpage URL to fetch")):
   """Get content of a webpage asynchronously."""
+  import html2text  # slow to import, so only load it when first used
   if not url.startswith(("http://", "https://")):
     url = "https://" + url
   async with aiohttp.ClientSession() as session:
@@ -53,14 +53,38 @@ async def web_search(
 
 
 class Tools:
-  TYPES = collections.defaultdict(lambda: "string", {int: "integer"})
+  TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+  ENTRY_POINT_GROUP = "aoibot.tools"
 
-  def __init__(self):
-    self._tools = {f.__name__: f for f in [get_time, web_fetch, web_search]}
+  def __init__(self, functions=(get_time, web_fetch, web_search)):
+    self._tools = {}
+    self._specs = {}
+    self._defaults = {}
+    for f in functions:
+      self.register(f)
+
+  def register(self, f):
+    """Adds |f| as a tool, precomputing its spec and default arguments."""
+    self._tools[f.__name__] = f
+    self._specs[f.__name__] = self._get_spec(f)
+    self._defaults[f.__name__] = {
+        name: p.default.default
+        for name, p in inspect.signature(f).parameters.items()
+        if isinstance(p.default, FieldInfo) and not p.default.is_required()
+    }
+
+  def load_entry_points(self):
+    """Registers extra tools advertised by installed packages."""
+    for entry_point in importlib.metadata.entry_points(
+        group=self.ENTRY_POINT_GROUP,
+    ):
+      try:
+        self.register(entry_point.load())
+      except Exception as e:
+        print(f"Error loading tool {entry_point.name}: {e}")
 
-  @functools.cache
   def tools(self):
-    return [self._get_spec(f) for f in self._tools.values()]
+    return list(self._specs.values())
 
   def _get_spec(self, f):
     spec = {
@@ -73,20 +97,92 @@ class Tools:
     }
     for name, p in inspect.signature(f).parameters.items():
       prop = {}
-      prop["type"] = self.TYPES[p.annotation]
-      prop["description"] = p.default.description
-      if p.default.is_required():
+      # unknown annotations get no type and are passed through unchanged
+      if p.annotation in self.TYPES:
+        prop["type"] = self.TYPES[p.annotation]
+      if isinstance(p.default, FieldInfo):
+        prop["description"] = p.default.description
+        required = p.default.is_required()
+      else:
+        required = p.default is inspect.Parameter.empty
+      if required:
         spec["function"]["parameters"]["required"].append(name)
       spec["function"]["parameters"]["properties"][name] = prop
     if not spec["function"]["parameters"]["properties"]:
       spec["function"]["parameters"] = {}
     return spec
 
-  async def call(self, method, **kwargs):
-    """Dispatch a tool, awaiting if it is async."""
+  def _validate(self, method, arguments):
+    """Checks |arguments| against the spec of |method|, coercing types."""
+    params = self._specs[method]["function"]["parameters"]
+    properties = params.get("properties", {})
+    unknown = set(arguments) - set(properties)
+    if unknown:
+      raise ValueError(
+          f"{method}: unexpected arguments: {', '.join(sorted(unknown))}"
+      )
+    missing = set(params.get("required", [])) - set(arguments)
+    if missing:
+      raise ValueError(
+          f"{method}: missing required arguments: {', '.join(sorted(missing))}"
+      )
+    args = dict(self._defaults[method])
+    for name, value in arguments.items():
+      args[name] = self._coerce(
+          method, name, properties[name].get("type"), value,
+      )
+    return args
+
+  def _coerce(self, method, name, type_, value):
+    if type_ == "integer":
+      if isinstance(value, int) and not isinstance(value, bool):
+        return value
+      if isinstance(value, float) and value.is_integer():
+        return int(value)
+      if isinstance(value, str):
+        try:
+          return int(value.strip())
+        except ValueError:
+          pass
+      raise ValueError(f"{method}: {name} must be an integer, got {value!r}")
+    if type_ == "number":
+      if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+      if isinstance(value, str):
+        try:
+          return float(value.strip())
+        except ValueError:
+          pass
+      raise ValueError(f"{method}: {name} must be a number, got {value!r}")
+    if type_ == "boolean":
+      if isinstance(value, bool):
+        return value
+      if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+      raise ValueError(f"{method}: {name} must be a boolean, got {value!r}")
+    if type_ == "string":
+      if isinstance(value, str):
+        return value
+      if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+      raise ValueError(f"{method}: {name} must be a string, got {value!r}")
+    return value
+
+  async def call(self, method, arguments=None):
+    """Validates arguments and dispatches a tool, awaiting if it is async.
+
+    |arguments| is a dict rather than keyword arguments so that any name the
+    model sends, including "method", goes through validation.
+    """
     if method not in self._tools:
       raise ValueError(f"unknown method: {method}")
     fn = self._tools[method]
+    kwargs = self._validate(method, arguments or {})
     if asyncio.iscoroutinefunction(fn):
       return await fn(**kwargs)
     return fn(**kwargs)
+
+
+# Built once per process and shared by every Conversation.
+TOOLS = Tools()
+TOOLS.load_entry_points()
@@ -4,7 +4,9 @@ import json
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
-from tools import get_time, web_fetch, web_search, Tools
+from pydantic import Field
+
+from tools import get_time, web_fetch, web_search, Tools, TOOLS
 
 
 class ToolsTest(unittest.IsolatedAsyncioTestCase):
@@ -61,15 +63,74 @@ class ToolsTest(unittest.IsolatedAsyncioTestCase):
     def dummy_sync(y):
       return y + 1
 
-    tools._tools['dummy_async'] = dummy_async
-    tools._tools['dummy_sync'] = dummy_sync
-    result_async = await tools.call('dummy_async', x=5)
+    tools.register(dummy_async)
+    tools.register(dummy_sync)
+    result_async = await tools.call('dummy_async', {'x': 5})
     self.assertEqual(result_async, 10)
-    result_sync = await tools.call('dummy_sync', y=7)
+    result_sync = await tools.call('dummy_sync', {'y': 7})
     self.assertEqual(result_sync, 8)
     with self.assertRaises(ValueError):
       await tools.call('nonexistent')
 
+  async def test_tools_call_validation(self):
+    tools = Tools()
+    def dummy(query: str = Field(..., description='q'),
+              count: int = Field(5, description='c')):
+      return (query, count)
+
+    tools.register(dummy)
+    self.assertEqual(await tools.call('dummy', {'query': 'a'}), ('a', 5))
+    self.assertEqual(
+        await tools.call('dummy', {'query': 1, 'count': '3'}), ('1', 3))
+    self.assertEqual(await tools.call('dummy', {'query': 'a', 'count': 2.0}), ('a', 2))
+    with self.assertRaisesRegex(ValueError, 'missing required arguments: query'):
+      await tools.call('dummy')
+    with self.assertRaisesRegex(ValueError, 'unexpected arguments: extra'):
+      await tools.call('dummy', {'query': 'a', 'extra': 1})
+    with self.assertRaisesRegex(ValueError, 'count must be an integer'):
+      await tools.call('dummy', {'query': 'a', 'count': 'many'})
+    with self.assertRaisesRegex(ValueError, 'query must be a string'):
+      await tools.call('dummy', {'query': None})
+
+  async def test_tools_call_bool_and_float(self):
+    tools = Tools()
+    def dummy(flag: bool = Field(..., description='f'),
+              ratio: float = Field(0.5, description='r')):
+      return (flag, ratio)
+
+    tools.register(dummy)
+    params = tools.tools()[-1]['function']['parameters']['properties']
+    self.assertEqual(params['flag']['type'], 'boolean')
+    self.assertEqual(params['ratio']['type'], 'number')
+    self.assertEqual(await tools.call('dummy', {'flag': True}), (True, 0.5))
+    self.assertEqual(
+        await tools.call('dummy', {'flag': 'false', 'ratio': 2}), (False, 2.0))
+    self.assertEqual(
+        await tools.call('dummy', {'flag': False, 'ratio': '0.25'}),
+        (False, 0.25))
+    with self.assertRaisesRegex(ValueError, 'flag must be a boolean'):
+      await tools.call('dummy', {'flag': 1})
+    with self.assertRaisesRegex(ValueError, 'ratio must be a number'):
+      await tools.call('dummy', {'flag': True, 'ratio': 'half'})
+
+  async def test_tools_call_unknown_annotation_passes_through(self):
+    tools = Tools()
+    def dummy(items: list = Field(..., description='i')):
+      return items
+
+    tools.register(dummy)
+    params = tools.tools()[-1]['function']['parameters']['properties']
+    self.assertNotIn('type', params['items'])
+    self.assertEqual(await tools.call('dummy', {'items': [1, 2]}), [1, 2])
+
+  async def test_tools_call_argument_named_method(self):
+    with self.assertRaisesRegex(ValueError, 'unexpected arguments: method'):
+      await TOOLS.call('get_time', {'method': 'x'})
+
+  def test_shared_registry(self):
+    self.assertEqual(TOOLS.tools(), Tools().tools())
+    self.assertIs(TOOLS.tools()[0], TOOLS.tools()[0])
+
   async def test_web_fetch(self):
     # Mock aiohttp.ClientSession and its GET request using async context manager semantics
     with patch('tools.aiohttp.ClientSession') as mock_client_class: